@@ -1,17 +1,26 @@
-import os, sys, pathlib, re
-from datetime import datetime
+import hashlib, io, json, os, sys, pathlib, re, operator, threading, time, unicodedata
+from datetime import datetime, timezone
+from functools import lru_cache
+from itertools import zip_longest
 from typing import Dict, Any, List, Tuple, Set, Optional
 
 import requests
 from pyairtable import Api
-from reportlab.lib.pagesizes import A4, landscape
-from reportlab.lib import colors
-from reportlab.pdfgen import canvas
-from reportlab.platypus import (
-    SimpleDocTemplate, Paragraph, Spacer, Table as PdfTable, TableStyle, Image, Flowable
-)
-from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
-from reportlab.lib.enums import TA_CENTER
+
+try:  # faster JSON decoding for the rollup-heavy Airtable pages, if available
+    import orjson as _orjson
+    import requests.models as _rq_models
+    from types import SimpleNamespace as _NS
+
+    # Only swap loads: requests calls dumps(..., allow_nan=False), which
+    # orjson.dumps neither accepts nor needs (it returns bytes, too).
+    _rq_models.complexjson = _NS(loads=_orjson.loads, dumps=json.dumps,
+                                 JSONDecodeError=json.JSONDecodeError)
+except ImportError:
+    pass
+
+# ReportLab is imported lazily (see _rl below): cold-starting it costs tens of
+# ms and several dozen modules, which cache-hit and error-exit runs never need.
 
 # ========= ENV =========
 AIRTABLE_API_KEY = os.environ["AIRTABLE_API_KEY"]
@@ -25,6 +34,14 @@ RECORD_ID_SINGLE = os.getenv("RECORD_ID") or (sys.argv[1] if len(sys.argv) > 1 e
 
 INCLUDE_MATCH_BY_NAME = os.getenv("INCLUDE_MATCH_BY_NAME", "0").strip() == "1"
 
+# Render the whole batch into one multi-page PDF (single layout pass) instead
+# of one file per student.
+COMBINED_PDF = os.getenv("COMBINED_PDF", "0").strip() == "1"
+
+# Optional SQLite mirror maintained by sync_airtable.py; when set and present,
+# match-by-name lookups hit the local index instead of the Airtable API.
+MIRROR_DB = os.getenv("MIRROR_DB", "").strip()
+
 if not RECORD_IDS_ENV and not RECORD_ID_SINGLE:
     sys.exit("[ERROR] Provide at least one record id via RECORD_IDS (comma-separated) or RECORD_ID")
 
@@ -38,6 +55,13 @@ SIGNATURE_PATH = os.environ.get("SIGNATURE_PATH", "signature_principal.png")
 PRINCIPAL      = os.environ.get("PRINCIPAL_NAME", "Ursula Derios")
 SIGN_DATEFMT   = os.environ.get("SIGN_DATE_FMT", "%B %d, %Y")
 
+# Signature lines are constant across a run, so format them once instead of
+# per PDF. SIGN_DATE_OVERRIDE pins the date string for reproducible output
+# (keeps the content-hash short-circuit stable across days).
+TODAY_STR      = os.environ.get("SIGN_DATE_OVERRIDE") or datetime.today().strftime(SIGN_DATEFMT)
+PRINCIPAL_LINE = f"Principal - {PRINCIPAL}"
+DATE_LINE      = f"Date: {TODAY_STR}"
+
 # allow custom column widths (six values for the six columns)
 TABLE_COL_WIDTHS = os.environ.get("TABLE_COL_WIDTHS", "").strip()
 
@@ -71,12 +95,9 @@ F = {
     "course_code_rollup": "Course Code Rollup (from Southlands Courses Enrollment 3)",
 }
 
-# ========= THEME =========
-GRAY_HEADER = colors.HexColor("#F1F3F5")
-ROW_ALT     = colors.HexColor("#FBFCFD")
-BORDER_GRAY = colors.HexColor("#D0D7DE")
-INK         = colors.HexColor("#0F172A")
-ACCENT      = colors.HexColor("#0C4A6E")
+# Only these columns are ever read; projecting the API response down to them
+# cuts payload size dramatically on rollup-heavy tables.
+PROJECT = list(F.values())
 
 # ========= TWEAKS =========
 TOP_GUTTER_PTS   = 200
@@ -88,22 +109,161 @@ SIG_IMG_SHIFT    = int(os.environ.get("SIG_IMG_SHIFT", "-90"))
 SIG_IMG_MAX_W    = int(os.environ.get("SIG_IMG_MAX_W", "160"))
 SIG_IMG_MAX_H    = int(os.environ.get("SIG_IMG_MAX_H", "50"))
 
+# asset paths are static for the process lifetime; stat them once
+HAS_LOGO = pathlib.Path(LOGO_PATH).is_file()
+HAS_SIG  = pathlib.Path(SIGNATURE_PATH).is_file()
+
 api = Api(AIRTABLE_API_KEY)
 
+# Widen the keep-alive pool past the default 10 so the scan and attach
+# thread pools never evict each other's sockets. Re-mounting replaces
+# pyairtable's adapter, so carry its 429 retry strategy over.
+try:
+    from requests.adapters import HTTPAdapter
+    from pyairtable import retry_strategy
+    api.session.mount("https://", HTTPAdapter(pool_maxsize=16, max_retries=retry_strategy()))
+except Exception as e:
+    print(f"[DEBUG] Could not widen connection pool: {e}")
+
+# ========= RESPONSE CACHE =========
+# Disk cache for Airtable reads so re-runs during template iteration hit local
+# files instead of the rate-limited API. Policies:
+#   disabled   — always call the API (default; transcripts track live grades)
+#   enabled    — serve cached responses younger than CACHE_TTL_S, else call+store
+#   replay     — serve cached responses regardless of age; never call the API
+#   write_only — always call the API and refresh the cache
+CACHE_POLICY = os.environ.get("CACHE_POLICY", "disabled").strip().lower()
+CACHE_TTL_S  = int(os.environ.get("CACHE_TTL_S", "604800"))  # 7 days
+_CACHE_DIR   = pathlib.Path("output/.cache/airtable")
+
+def _cache_path(table_name: str, what: str) -> pathlib.Path:
+    key = hashlib.sha256(f"{AIRTABLE_BASE_ID}|{table_name}|{what}".encode()).hexdigest()
+    return _CACHE_DIR / f"{key}.json"
+
+def _cache_read(path: pathlib.Path, any_age: bool = False):
+    try:
+        if not path.is_file():
+            return None
+        if not any_age and (time.time() - path.stat().st_mtime) > CACHE_TTL_S:
+            return None
+        return json.loads(path.read_text("utf-8"))
+    except Exception as e:
+        print(f"[DEBUG] Cache read failed for {path.name}: {e}")
+        return None
+
+def _cache_write(path: pathlib.Path, payload) -> None:
+    try:
+        _CACHE_DIR.mkdir(parents=True, exist_ok=True)
+        path.write_text(json.dumps(payload), "utf-8")
+    except Exception as e:
+        print(f"[WARN] Cache write failed for {path.name}: {e}")
+
+class TokenBucket:
+    """Self-throttle below Airtable's 5 req/s per-base cap instead of relying
+    on 429 retry backoff. Thread-safe for the parallel fetch paths."""
+    def __init__(self, rate: float, capacity: Optional[float] = None):
+        self.rate = float(rate)
+        self.capacity = float(capacity if capacity is not None else rate)
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self) -> None:
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= 1.0:
+                    self.tokens -= 1.0
+                    return
+                wait = (1.0 - self.tokens) / self.rate
+            time.sleep(wait)
+
+# leave headroom under the 5 req/s boundary
+_BUCKET = TokenBucket(rate=float(os.environ.get("AIRTABLE_RPS", "4")))
+
+_PROJ_KEY = ",".join(sorted(PROJECT))
+
+def cached_get(table, record_id: str):
+    if CACHE_POLICY == "disabled":
+        _BUCKET.acquire()
+        return table.get(record_id, fields=PROJECT)
+    path = _cache_path(table.name, f"get|{record_id}|{_PROJ_KEY}")
+    if CACHE_POLICY == "replay":
+        hit = _cache_read(path, any_age=True)
+        if hit is None:
+            raise RuntimeError(f"Cache miss for record {record_id} with CACHE_POLICY=replay")
+        return hit
+    if CACHE_POLICY == "enabled":
+        hit = _cache_read(path)
+        if hit is not None:
+            return hit
+    _BUCKET.acquire()
+    rec = table.get(record_id, fields=PROJECT)
+    _cache_write(path, rec)
+    return rec
+
+def _fetch_all(table, formula: str) -> List[Dict[str, Any]]:
+    """Page through table.iterate() instead of table.all(): one rate-limit
+    token per underlying request (all() took a single token for the whole
+    scan), and each raw page becomes collectable as soon as its slimmed
+    records — just id + projected fields — are copied out."""
+    rows: List[Dict[str, Any]] = []
+    pages = table.iterate(formula=formula, fields=PROJECT)
+    while True:
+        _BUCKET.acquire()
+        page = next(pages, None)
+        if page is None:
+            return rows
+        rows.extend({"id": r["id"], "fields": r.get("fields", {})} for r in page)
+
+def cached_all(table, formula: str):
+    if CACHE_POLICY == "disabled":
+        return _fetch_all(table, formula)
+    path = _cache_path(table.name, f"all|{formula}|{_PROJ_KEY}")
+    if CACHE_POLICY == "replay":
+        hit = _cache_read(path, any_age=True)
+        if hit is None:
+            raise RuntimeError(f"Cache miss for formula {formula!r} with CACHE_POLICY=replay")
+        return hit
+    if CACHE_POLICY == "enabled":
+        hit = _cache_read(path)
+        if hit is not None:
+            return hit
+    rows = _fetch_all(table, formula)
+    _cache_write(path, rows)
+    return rows
+
 # ========= HELPERS =========
 def sget(fields: Dict[str, Any], key: str, default: str = "") -> str:
     v = fields.get(key)
+    if type(v) is str: return v  # the 90% case: plain text/select cells
     if v is None: return default
     if isinstance(v, list): return ", ".join(str(x) for x in v if str(x).strip())
     return str(v)
 
+_SPLIT = re.compile(r"\s*,\s*")
+
 def listify(v: Any) -> List[str]:
     if v is None: return []
-    if isinstance(v, list): return [str(x).strip() for x in v if str(x).strip()]
-    return [p.strip() for p in str(v).split(",") if p.strip()]
-
+    if type(v) is str:
+        v = v.strip()
+        if not v: return []
+        if "," not in v: return [v]  # no split machinery for single values
+        return [s for s in _SPLIT.split(v) if s]
+    if type(v) is list:
+        # Airtable list cells are almost always strings already; only coerce
+        # the odd non-string element
+        return [s for s in (x.strip() if type(x) is str else str(x).strip() for x in v) if s]
+    return [s for s in _SPLIT.split(str(v).strip()) if s]
+
+_QUOTE_TBL = str.maketrans({'"': '\\"'})
+
+@lru_cache(maxsize=4096)
 def esc(s: str) -> str:
-    return (s or "").replace('"', '\\"')
+    # the same student names recur in formulas across tables and re-runs
+    return (s or "").translate(_QUOTE_TBL)
 
 def to_float_from_mixed(v: Any) -> Optional[float]:
     """
@@ -123,6 +283,7 @@ def to_float_from_mixed(v: Any) -> Optional[float]:
     except Exception:
         return None
 
+@lru_cache(maxsize=1)
 def table_names() -> List[str]:
     names = [t.strip() for t in TRANSCRIPT_TABLES_ENV.split(",") if t.strip()]
     if not names and TRANSCRIPT_TABLE_FALLBACK.strip():
@@ -131,9 +292,13 @@ def table_names() -> List[str]:
         names = ["Students 1221"]
     return names
 
+@lru_cache(maxsize=8)
+def _tbl(name: str):
+    return api.table(AIRTABLE_BASE_ID, name)
+
 def try_get(table_name: str, record_id: str):
-    t = api.table(AIRTABLE_BASE_ID, table_name)
-    return t, t.get(record_id)
+    t = _tbl(table_name)
+    return t, cached_get(t, record_id)
 
 def get_rec_and_table(record_id: str):
     last_err = None
@@ -147,74 +312,135 @@ def get_rec_and_table(record_id: str):
             print(f"[DEBUG] Not in '{tname}': {e}")
     raise SystemExit(f"[ERROR] Record {record_id} not found in any configured tables. Last error: {last_err}")
 
-def fetch_rows_for_name_across_all_tables(student_name: str) -> List[Dict[str, Any]]:
-    merged: List[Dict[str, Any]] = []
+def bulk_resolve(ids: List[str]) -> Dict[str, Dict[str, Any]]:
+    """Resolve many record ids with one OR(RECORD_ID()=...) query per table
+    instead of one GET per id. IDs not found in the first table fall through
+    to the next configured table."""
+    pending = list(dict.fromkeys(ids))
+    resolved: Dict[str, Dict[str, Any]] = {}
     for tname in table_names():
+        if not pending:
+            break
         try:
-            tbl = api.table(AIRTABLE_BASE_ID, tname)
-            formula = f'{{{F["student_name"]}}} = "{esc(student_name)}"'
-            rows = tbl.all(formula=formula)
-            if rows:
-                print(f"[INFO] +{len(rows)} rows from '{tname}' for {student_name}")
-                merged.extend(rows)
+            tbl = _tbl(tname)
+            # ~100 ids per OR() keeps the formula comfortably inside
+            # Airtable's URL length limit
+            recs = []
+            for i in range(0, len(pending), 100):
+                formula = "OR(" + ",".join(f"RECORD_ID()='{esc(r)}'" for r in pending[i:i + 100]) + ")"
+                recs.extend(cached_all(tbl, formula))
+        except Exception as e:
+            print(f"[WARN] Could not batch-query '{tname}': {e}")
+            continue
+        found = {r["id"]: r for r in recs if r.get("id")}
+        if found:
+            print(f"[INFO] Resolved {len(found)} record(s) in table: {tname}")
+            resolved.update(found)
+            pending = [r for r in pending if r not in found]
+    return resolved
+
+def _mirror_groups(names: List[str]) -> Dict[str, List[Dict[str, Any]]]:
+    """Serve the name lookups from the sync_airtable.py SQLite mirror: an
+    indexed local read instead of a formula scan per table over the API."""
+    import sqlite3
+    groups: Dict[str, List[Dict[str, Any]]] = {}
+    con = sqlite3.connect(MIRROR_DB)
+    try:
+        qmarks = ",".join("?" * len(names))
+        for nm, fj in con.execute(
+            f"SELECT student_name, fields_json FROM records WHERE student_name IN ({qmarks})",
+            names,
+        ):
+            groups.setdefault(nm, []).append(json.loads(fj))
+    finally:
+        con.close()
+    return groups
+
+def fetch_rows_for_names_across_all_tables(names: List[str]) -> Dict[str, List[Dict[str, Any]]]:
+    """One OR({Student Name}=...) query per table for the whole batch,
+    bucketed by student name, instead of one formula query per student."""
+    groups: Dict[str, List[Dict[str, Any]]] = {}
+    if not names:
+        return groups
+    if MIRROR_DB and pathlib.Path(MIRROR_DB).is_file():
+        try:
+            found = _mirror_groups(names)
+            print(f"[INFO] Mirror served {sum(map(len, found.values()))} rows for {len(found)} students")
+            return found
+        except Exception as e:
+            print(f"[WARN] Mirror lookup failed ({e}); falling back to the API.")
+    # ~50 names per OR() keeps the encoded filterByFormula well under
+    # Airtable's 16k URL ceiling for very large batches
+    formulas = [
+        "OR(" + ",".join(f'{{{F["student_name"]}}} = "{esc(n)}"' for n in chunk) + ")"
+        for chunk in (names[i:i + 50] for i in range(0, len(names), 50))
+    ]
+    def _scan(tname: str) -> List[Dict[str, Any]]:
+        tbl = _tbl(tname)
+        rows: List[Dict[str, Any]] = []
+        for formula in formulas:
+            rows.extend(cached_all(tbl, formula))
+        return rows
+
+    tables = table_names()
+    if len(tables) > 1:
+        # fire the per-table scans concurrently; requests releases the GIL
+        # during I/O and the token bucket caps the combined rate
+        from concurrent.futures import ThreadPoolExecutor
+        with ThreadPoolExecutor(max_workers=min(8, len(tables))) as ex:
+            futures = {tname: ex.submit(_scan, tname) for tname in tables}
+        results = futures  # resolved below in table order, for stable bucketing
+    else:
+        results = None
+
+    # Airtable's formula `=` matches names case-insensitively, so bucket the
+    # same way: a row stored as "JOHN DOE" still lands under the requested
+    # "John Doe" key instead of a bucket nobody reads.
+    requested = {n.casefold(): n for n in names}
+    for tname in tables:
+        try:
+            rows = results[tname].result() if results else _scan(tname)
         except Exception as e:
             print(f"[WARN] Could not query '{tname}': {e}")
-    return merged
+            continue
+        if rows:
+            print(f"[INFO] +{len(rows)} rows from '{tname}'")
+        for r in rows:
+            raw = r.get("fields", {}).get(F["student_name"])
+            nm = raw[0] if isinstance(raw, list) and raw else str(raw or "")
+            if nm:
+                groups.setdefault(requested.get(nm.casefold(), nm), []).append(r)
+    return groups
+
+def fetch_rows_for_name_across_all_tables(student_name: str) -> List[Dict[str, Any]]:
+    return fetch_rows_for_names_across_all_tables([student_name]).get(student_name, [])
+
+# trailing context is a lookahead so adjacent markers ("… A B") both match
+_SEM_RE = re.compile(r"(?:^|[\s-])([ab])(?=$|\s)", re.I)
 
+@lru_cache(maxsize=1024)
 def detect_semester(name: str, code: str) -> Tuple[bool, bool]:
-    t = f"{name} {code}".lower()
-    is_a = ("-a" in t) or (" a " in t) or t.endswith(" a")
-    is_b = ("-b" in t) or (" b " in t) or t.endswith(" b")
+    found = {m.lower() for m in _SEM_RE.findall(f"{name} {code}")}
+    is_a = "a" in found
+    is_b = "b" in found
     return (is_a and not is_b, is_b and not is_a)
 
-class CenterLine(Flowable):
-    def __init__(self, width=220, thickness=0.9):
-        super().__init__()
-        self.width, self.thickness = width, thickness
-        self.height = 3
-    def draw(self):
-        self.canv.setLineWidth(self.thickness)
-        self.canv.line(-self.width/2, 0, self.width/2, 0)
-
-def draw_page_border(canv: canvas.Canvas, doc):
-    canv.saveState()
-    canv.setStrokeColor(BORDER_GRAY)
-    canv.setLineWidth(0.6)
-    m = 18
-    w, h = landscape(A4)
-    canv.rect(m, m, w-2*m, h-2*m)
-    canv.restoreState()
-
-def fit_image(path: str, max_w: float, max_h: float) -> Image:
-    img = Image(path)
-    iw, ih = img.imageWidth, img.imageHeight
-    if iw == 0 or ih == 0:
-        return Image(path, width=max_w, height=max_h)
-    scale = min(max_w/iw, max_h/ih)
-    img._restrictSize(int(iw*scale), int(ih*scale))
-    return img
-
-class ShiftedImage(Flowable):
-    def __init__(self, path: str, max_w: float, max_h: float, dx: int = 0):
-        super().__init__()
-        from reportlab.lib.utils import ImageReader
-        self.dx = dx
-        self.img = ImageReader(path)
-        iw, ih = self.img.getSize()
-        scale = min(max_w/iw, max_h/ih) if iw and ih else 1.0
-        self.w, self.h = (iw*scale if iw else max_w), (ih*scale if ih else max_h)
-        self.width = self.w
-        self.height = self.h
-    def draw(self):
-        self.canv.saveState()
-        self.canv.translate(self.dx, 0)
-        self.canv.drawImage(self.img, 0, 0, width=self.w, height=self.h, mask='auto')
-        self.canv.restoreState()
+@lru_cache(maxsize=4096)
+def _pdf_safe(s: str) -> str:
+    """Keep text on the base-14 Helvetica faces: fold accents via NFKD and
+    drop anything that still won't encode as Latin-1. Avoids ReportLab ever
+    falling back to TTF embedding/subset computation mid-story."""
+    if not s or s.isascii():
+        return s
+    return unicodedata.normalize("NFKD", s).encode("latin-1", "ignore").decode("latin-1")
+
+_WS_RE  = re.compile(r"\s+")
+_BAD_RE = re.compile(r"[^A-Za-z0-9._-]+")
 
 def safe_filename(raw: str) -> str:
-    s = re.sub(r"\s+", "_", raw or "")
+    s = _WS_RE.sub("_", raw or "")
     s = s.replace(",", "_")
-    s = re.sub(r"[^A-Za-z0-9._-]+", "_", s)
+    s = _BAD_RE.sub("_", s)
     return s.strip("_") or "file"
 
 # ---- quality points map ----
@@ -227,22 +453,37 @@ QP_STANDARD = {
 }
 # In absence of an explicit Honors/AP flag, we’ll treat courses containing
 # "honors" or "ap" (case-insensitive) as honors and add +1 quality point.
+_HONORS_RE = re.compile(r"\b(honors|ap)\b", re.I)
+
+@lru_cache(maxsize=1024)
 def transferred_credits(letter: str, course_name: str) -> Optional[float]:
+    # tiny pure domain (12 letters x recurring course names) hit once per row
     if not letter:
         return None
     base = QP_STANDARD.get(letter.upper())
     if base is None:
         return None
-    is_honors = bool(re.search(r"\b(honors|ap)\b", (course_name or ""), flags=re.I))
+    is_honors = bool(_HONORS_RE.search(course_name or ""))
     return round(base + (1.0 if is_honors and base > 0 else 0.0), 1)
 
+# hoisted field names: local lookups beat per-row dict indexing in the loop below
+_F_NAME        = F["course_name"]
+_F_NAME_ROLLUP = F["course_name_rollup"]
+_F_CODE        = F["course_code"]
+_F_CODE_ROLLUP = F["course_code_rollup"]
+_F_TEACHERS    = F["assigned_teachers"]
+_F_LETTER      = F["letter"]
+_F_SCORE       = F["current_score"]
+
 # ---- build rows for a single record (strict pairing) ----
 def build_course_rows(fields: Dict[str, Any]) -> List[List[str]]:
-    names    = listify(fields.get(F["course_name"])) or listify(fields.get(F["course_name_rollup"]))
-    codes    = listify(fields.get(F["course_code"])) or listify(fields.get(F["course_code_rollup"]))
-    teachers = listify(fields.get(F["assigned_teachers"]))
-    letter   = sget(fields, F["letter"]).strip()
-    score    = to_float_from_mixed(fields.get(F["current_score"]))  # Grade %
+    # one extraction pass over the record's fields
+    get = fields.get
+    names    = listify(get(_F_NAME)) or listify(get(_F_NAME_ROLLUP))
+    codes    = listify(get(_F_CODE)) or listify(get(_F_CODE_ROLLUP))
+    teachers = listify(get(_F_TEACHERS))
+    letter   = sget(fields, _F_LETTER).strip()
+    score    = to_float_from_mixed(get(_F_SCORE))  # Grade %
 
     if not names and not codes:
         return []
@@ -261,41 +502,63 @@ def build_course_rows(fields: Dict[str, Any]) -> List[List[str]]:
             m = min(len(names), len(codes))
             names, codes = names[:m], codes[:m]
 
-    first_teacher = teachers[0].split(",")[0].strip() if teachers else ""
+    first_teacher = teachers[0].split(",", 1)[0].strip() if teachers else ""
     rows: List[List[str]] = []
+    append = rows.append
+
+    # the letter and percent are record-level, not per-course; format once
+    grade_letter = letter or "—"
+    grade_pct    = "" if score is None else f"{score:.2f}"
 
-    for i in range(len(names)):
-        nm = names[i].strip()
-        cd = codes[i].strip()
-        tchr = (teachers[i] if i < len(teachers) else first_teacher)
-        tchr = tchr.split(",")[0].strip()
+    for nm, cd, tchr_raw in zip_longest(names, codes, teachers, fillvalue=""):
+        nm = nm.strip()
+        cd = cd.strip()
+        tchr = (tchr_raw or first_teacher).split(",", 1)[0].strip()
 
         if not (nm or cd):
             continue
 
-        # Single Grade (Letter)
-        grade_letter = letter or "—"
-        grade_pct    = "" if score is None else f"{score:.2f}"
         tcredits     = transferred_credits(grade_letter, nm)
         tcredits_s   = "" if tcredits is None else f"{tcredits:g}"
 
-        rows.append([nm, cd, tchr, grade_letter, grade_pct, tcredits_s])
+        append([nm, cd, tchr, grade_letter, grade_pct, tcredits_s])
 
     return rows
 
+def _expand_rows(rows: List[Dict[str, Any]]) -> List[List[str]]:
+    expanded: List[List[str]] = []
+    for r in rows:
+        expanded.extend(build_course_rows(r.get("fields", {})))
+    return expanded
+
 # ---- summarize courses for logging ----
-def summarize_courses(rows: List[Dict[str, Any]]) -> str:
+def summarize_courses(rows: List[Dict[str, Any]],
+                      expanded: Optional[List[List[str]]] = None) -> str:
+    if expanded is None:
+        expanded = _expand_rows(rows)
     lines: List[str] = []
-    for r in rows:
-        f = r.get("fields", {})
-        local = build_course_rows(f)
-        for nm, cd, *_ in local:
-            if not (nm or cd):
-                continue
-            lines.append(f"{nm} — {cd}" if cd else nm)
+    for nm, cd, *_ in expanded:
+        if not (nm or cd):
+            continue
+        lines.append(f"{nm} — {cd}" if cd else nm)
     return "\n".join(lines) if lines else ""
 
 # ---- attachment helper ----
+@lru_cache(maxsize=1)
+def _upload_session() -> requests.Session:
+    """Persistent session for the Web API attachment fallback: keep-alive
+    across uploads plus retries on the usual transient statuses."""
+    from requests.adapters import HTTPAdapter, Retry
+    s = requests.Session()
+    s.headers["Authorization"] = f"Bearer {AIRTABLE_API_KEY}"
+    s.mount("https://", HTTPAdapter(
+        pool_connections=1, pool_maxsize=8,
+        max_retries=Retry(total=3, backoff_factor=0.5,
+                          status_forcelist=[429, 500, 502, 503],
+                          allowed_methods=["POST", "PATCH"]),
+    ))
+    return s
+
 def attach_pdf_to_log_record(log_table, rec_id: str, field_name: str, pdf_path: str):
     if not field_name:
         return
@@ -304,15 +567,18 @@ def attach_pdf_to_log_record(log_table, rec_id: str, field_name: str, pdf_path:
         return
     filename = os.path.basename(pdf_path)
     try:
-        with open(pdf_path, "rb") as fh:
-            content = fh.read()
-        log_table.upload_attachment(
-            rec_id,
-            field=field_name,
-            filename=filename,
-            content=content,
-            content_type="application/pdf",
-        )
+        # map the file instead of reading it into a bytes copy; the base64
+        # body the upload endpoint requires is built straight off the pages
+        import mmap
+        with open(pdf_path, "rb") as fh, \
+                mmap.mmap(fh.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            log_table.upload_attachment(
+                rec_id,
+                field=field_name,
+                filename=filename,
+                content=mm,
+                content_type="application/pdf",
+            )
         print(f"[OK] Attached PDF via pyairtable.upload_attachment → '{field_name}'.")
         return
     except Exception as e:
@@ -321,9 +587,8 @@ def attach_pdf_to_log_record(log_table, rec_id: str, field_name: str, pdf_path:
     try:
         with open(pdf_path, "rb") as fh:
             files = {"file": (filename, fh, "application/pdf")}
-            r = requests.post(
+            r = _upload_session().post(
                 f"https://api.airtable.com/v0/bases/{AIRTABLE_BASE_ID}/attachments",
-                headers={"Authorization": f"Bearer {AIRTABLE_API_KEY}"},
                 files=files,
                 timeout=60,
             )
@@ -337,19 +602,14 @@ def attach_pdf_to_log_record(log_table, rec_id: str, field_name: str, pdf_path:
         print(f"[WARN] PDF attachment upload failed even with fallback: {e}")
 
 # ---- LOGGING ----
-def log_to_airtable(pdf_path: pathlib.Path, header_fields: Dict[str, Any], rows: List[Dict[str, Any]]):
-    try:
-        tlog = api.table(AIRTABLE_BASE_ID, TRANSCRIPT_LOG_TABLE)
-    except Exception as e:
-        print(f"[WARN] Could not open log table '{TRANSCRIPT_LOG_TABLE}': {e}")
-        return
-
+def _build_log_payload(header_fields: Dict[str, Any], rows: List[Dict[str, Any]],
+                       expanded: Optional[List[List[str]]] = None) -> Tuple[Dict[str, Any], str, str]:
     student_name = sget(header_fields, F["student_name"]).strip()
     student_id   = sget(header_fields, F["student_id"])
     grade        = sget(header_fields, F["grade_select"])
     year         = sget(header_fields, F["school_year"])
-    run_at_iso   = datetime.utcnow().isoformat(timespec="seconds") + "Z"
-    courses_text = summarize_courses(rows)
+    run_at_iso   = datetime.now(timezone.utc).isoformat(timespec="seconds").replace("+00:00", "Z")
+    courses_text = summarize_courses(rows, expanded)
     source_ids   = ",".join({ r.get("id","") for r in rows if r.get("id") })
 
     payload = {}
@@ -360,8 +620,20 @@ def log_to_airtable(pdf_path: pathlib.Path, header_fields: Dict[str, Any], rows:
     if LOG_FIELD_RUN_AT:       payload[LOG_FIELD_RUN_AT]       = run_at_iso
     if LOG_FIELD_COURSES_TEXT: payload[LOG_FIELD_COURSES_TEXT] = courses_text
     if LOG_FIELD_SOURCE_IDS:   payload[LOG_FIELD_SOURCE_IDS]   = source_ids
+    return payload, student_name, year
 
+def log_to_airtable(pdf_path: pathlib.Path, header_fields: Dict[str, Any], rows: List[Dict[str, Any]],
+                    expanded: Optional[List[List[str]]] = None):
     try:
+        tlog = _tbl(TRANSCRIPT_LOG_TABLE)
+    except Exception as e:
+        print(f"[WARN] Could not open log table '{TRANSCRIPT_LOG_TABLE}': {e}")
+        return
+
+    payload, student_name, year = _build_log_payload(header_fields, rows, expanded)
+
+    try:
+        _BUCKET.acquire()
         rec = tlog.create(payload)
         print(f"[OK] Logged transcript to '{TRANSCRIPT_LOG_TABLE}' ({student_name}, {year})")
     except Exception as e:
@@ -373,24 +645,160 @@ def log_to_airtable(pdf_path: pathlib.Path, header_fields: Dict[str, Any], rows:
     except Exception as e:
         print(f"[WARN] Attach step failed: {e}")
 
-# ========= PDF =========
-def build_pdf(student_fields: Dict[str, Any], rows: List[Dict[str, Any]]):
-    student_name = sget(student_fields, F["student_name"]).strip()
-    student_id   = sget(student_fields, F["student_id"])
-    grade        = sget(student_fields, F["grade_select"])
-    year         = sget(student_fields, F["school_year"])
+def log_many(items: List[Tuple[pathlib.Path, Dict[str, Any], List[Dict[str, Any]], List[List[str]]]]):
+    """Create all log records 10 per POST via batch_create, then attach the
+    PDFs; one request per ten students instead of one create per student."""
+    try:
+        tlog = _tbl(TRANSCRIPT_LOG_TABLE)
+    except Exception as e:
+        print(f"[WARN] Could not open log table '{TRANSCRIPT_LOG_TABLE}': {e}")
+        return
 
-    out = pathlib.Path("output"); out.mkdir(parents=True, exist_ok=True)
-    pdf_path = out / f"transcript_{safe_filename(student_name)}_{safe_filename(year)}.pdf"
+    payloads = [_build_log_payload(hf, rows, expanded)[0] for _, hf, rows, expanded in items]
+    created: List[Dict[str, Any]] = []
+    batch_err: Optional[Exception] = None
+    for i in range(0, len(payloads), 10):
+        _BUCKET.acquire()
+        try:
+            created.extend(tlog.batch_create(payloads[i:i + 10]))
+        except Exception as e:
+            batch_err = e
+            break
+    if created:
+        print(f"[OK] Logged {len(created)} transcript(s) to '{TRANSCRIPT_LOG_TABLE}'")
+        # uploads are network-bound; overlap them like the rest of the log step
+        from concurrent.futures import ThreadPoolExecutor
+        with ThreadPoolExecutor(max_workers=min(4, len(created))) as ex:
+            futures = [
+                ex.submit(attach_pdf_to_log_record, tlog, rec["id"], LOG_FIELD_PDF_ATTACHMENT, str(pdf_path))
+                for rec, (pdf_path, *_) in zip(created, items)
+            ]
+            for f in futures:
+                f.result()
+    if batch_err is not None:
+        # only replay the chunks that never got created; the records above
+        # already exist and have their PDFs attached
+        rest = items[len(created):]
+        print(f"[WARN] Batch log create failed ({batch_err}); logging the remaining {len(rest)} record(s) one by one.")
+        for pdf_path, hf, rows, expanded in rest:
+            log_to_airtable(pdf_path, hf, rows, expanded)
+
+def _prepared_asset(path: str, max_w_pt: float, max_h_pt: float) -> str:
+    """Pre-shrink an oversized PNG to ~2x its display size with Pillow so the
+    PDF embeds a right-sized image instead of the full-resolution original.
+    Returns the original path when Pillow is absent or no shrink is needed."""
+    try:
+        from PIL import Image as PILImage
+    except ImportError:
+        return path
+    try:
+        src = pathlib.Path(path)
+        tw, th = int(max_w_pt * 2), int(max_h_pt * 2)  # 2x points for crispness
+        pre = pathlib.Path("output/.cache/assets") / f"{src.stem}_{tw}x{th}.png"
+        if pre.is_file() and pre.stat().st_mtime >= src.stat().st_mtime:
+            return str(pre)
+        with PILImage.open(src) as img:
+            if img.width <= tw and img.height <= th:
+                return path
+            img.thumbnail((tw, th), PILImage.LANCZOS)
+            pre.parent.mkdir(parents=True, exist_ok=True)
+            # tmp + rename so concurrent cold-cache workers never see a
+            # half-written file (same pattern as _write_pdf_atomic); the pid
+            # keeps workers racing on a cold cache off each other's tmp file
+            tmp = pre.with_suffix(f".{os.getpid()}.tmp")
+            img.save(tmp, format="PNG", optimize=True, compress_level=9)
+            os.replace(tmp, pre)
+        return str(pre)
+    except Exception as e:
+        print(f"[WARN] Asset pre-shrink failed for {path}: {e}")
+        return path
 
-    doc = SimpleDocTemplate(
-        str(pdf_path),
-        pagesize=landscape(A4),
-        leftMargin=28, rightMargin=28,
-        topMargin=24, bottomMargin=32
+# ========= PDF =========
+# Everything that needs ReportLab lives in a namespace built on first use, so
+# runs that never render (cache hits, bad record ids) skip the import cost.
+_RL = None
+
+def _rl():
+    global _RL
+    if _RL is not None:
+        return _RL
+
+    from types import SimpleNamespace
+    from reportlab.lib.pagesizes import A4, landscape
+    from reportlab.lib import colors
+    from reportlab.platypus import (
+        SimpleDocTemplate, Paragraph, Spacer, PageBreak, Table as PdfTable, TableStyle, Image, Flowable
     )
-    W = doc.width
-
+    from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
+    from reportlab.lib.utils import ImageReader
+    from reportlab.lib.enums import TA_CENTER
+
+    # ---- theme ----
+    GRAY_HEADER = colors.HexColor("#F1F3F5")
+    ROW_ALT     = colors.HexColor("#FBFCFD")
+    BORDER_GRAY = colors.HexColor("#D0D7DE")
+    INK         = colors.HexColor("#0F172A")
+    ACCENT      = colors.HexColor("#0C4A6E")
+
+    # pre-shrunk (if oversized) and decoded once per process, not per PDF
+    page_w = landscape(A4)[0] - 56  # matches the 28pt doc margins
+    LOGO_SRC = _prepared_asset(LOGO_PATH, page_w * LOGO_MAX_W_PCT, LOGO_MAX_H_PT) if HAS_LOGO else None
+    SIG_SRC  = _prepared_asset(SIGNATURE_PATH, SIG_IMG_MAX_W, SIG_IMG_MAX_H) if HAS_SIG else None
+    LOGO_READER = ImageReader(LOGO_SRC) if HAS_LOGO else None
+    SIG_READER  = ImageReader(SIG_SRC) if HAS_SIG else None
+
+    class SignatureBlock(Flowable):
+        """The whole signature block — image, rule, principal and date —
+        drawn straight on the canvas. Replaces the stack of single-cell
+        tables Platypus previously had to measure and paginate."""
+        LINE_W = 220
+        def __init__(self, total_w: float, col_w: float):
+            super().__init__()
+            self.width = total_w
+            self.cx = total_w - col_w / 2.0  # centre of the right-hand column
+            if HAS_SIG:
+                iw, ih = SIG_READER.getSize()
+                scale = min(SIG_IMG_MAX_W / iw, SIG_IMG_MAX_H / ih) if iw and ih else 1.0
+                self.img_w, self.img_h = iw * scale, ih * scale
+            else:
+                self.img_w = self.img_h = 0.0
+            # image, 3pt gap, rule, 4pt gap, two 12pt text lines
+            self.height = self.img_h + 3 + 4 + 26
+        def draw(self):
+            c = self.canv
+            y = self.height
+            if self.img_h:
+                y -= self.img_h
+                c.drawImage(SIG_READER, self.cx - self.img_w / 2 + SIG_IMG_SHIFT, y,
+                            width=self.img_w, height=self.img_h, mask='auto')
+            y -= 3
+            c.setLineWidth(0.9)
+            c.line(self.cx - self.LINE_W / 2, y, self.cx + self.LINE_W / 2, y)
+            c.setFont("Helvetica", 10)
+            y -= 4 + 10
+            c.drawCentredString(self.cx, y, PRINCIPAL_LINE)
+            y -= 12
+            c.drawCentredString(self.cx, y, DATE_LINE)
+
+    def draw_page_border(canv, doc):
+        canv.saveState()
+        canv.setStrokeColor(BORDER_GRAY)
+        canv.setLineWidth(0.6)
+        m = 18
+        w, h = landscape(A4)
+        canv.rect(m, m, w-2*m, h-2*m)
+        canv.restoreState()
+
+    def fit_image(path: str, max_w: float, max_h: float) -> Image:
+        img = Image(path)
+        iw, ih = img.imageWidth, img.imageHeight
+        if iw == 0 or ih == 0:
+            return Image(path, width=max_w, height=max_h)
+        scale = min(max_w/iw, max_h/ih)
+        img._restrictSize(int(iw*scale), int(ih*scale))
+        return img
+
+    # styles are identical for every PDF; built once alongside the imports
     styles = getSampleStyleSheet()
     styles.add(ParagraphStyle("rc_tiny",  fontName="Helvetica",      fontSize=8.5,  textColor=INK, leading=10))
     styles.add(ParagraphStyle("rc_small", fontName="Helvetica",      fontSize=9.5,  textColor=INK, leading=11))
@@ -399,145 +807,282 @@ def build_pdf(student_fields: Dict[str, Any], rows: List[Dict[str, Any]]):
     styles.add(ParagraphStyle("rc_h1",    fontName="Helvetica-Bold", fontSize=16,   textColor=INK, alignment=TA_CENTER, leading=18))
     styles.add(ParagraphStyle("rc_h2",    fontName="Helvetica-Bold", fontSize=12,   textColor=INK, alignment=TA_CENTER, leading=14))
 
-    story: List[Any] = []
-
-    # Header strip
-    left_data = [
-        [Paragraph("<b>Student Info</b>", styles["rc_bold"]), ""],
-        ["Name", Paragraph(student_name, styles["rc_body"])],
-        ["Current Grade Level", Paragraph(str(grade or ""), styles["rc_body"])],
-        ["Student ID", Paragraph(str(student_id or ""), styles["rc_body"])],
-    ]
-    left_tbl = PdfTable(left_data, colWidths=[W*0.12, W*0.28])
-    left_tbl.setStyle(TableStyle([
+    LEFT_TBL_STYLE = TableStyle([
         ("SPAN", (0,0), (1,0)),
         ("BACKGROUND", (0,0), (1,0), GRAY_HEADER),
         ("FONTNAME", (0,0), (1,0), "Helvetica-Bold"),
         ("GRID", (0,0), (-1,-1), 0.6, BORDER_GRAY),
         ("FONTSIZE", (0,0), (-1,-1), 9.5),
+        ("FONTSIZE", (1,1), (1,-1), 10.5),  # value column matched the old rc_body size
         ("VALIGN", (0,0), (-1,-1), "MIDDLE"),
         ("LEFTPADDING", (0,0), (-1,-1), 6),
         ("RIGHTPADDING", (0,0), (-1,-1), 6),
         ("TOPPADDING", (0,0), (-1,-1), 6),
         ("BOTTOMPADDING", (0,0), (-1,-1), 6),
-    ]))
-
-    right_data = [
-        [Paragraph(f"<b>{SCHOOL_NAME}</b>", styles["rc_body"])],
-        [Paragraph(ADDR_LINE_1, styles["rc_small"])],
-        [Paragraph(ADDR_LINE_2, styles["rc_small"])],
-        [Paragraph(ADDR_LINE_3, styles["rc_small"]) if ADDR_LINE_3 else Paragraph("", styles["rc_small"])],
-    ]
-    right_tbl = PdfTable(right_data, colWidths=[W*0.45])
-    right_tbl.setStyle(TableStyle([
-        ("ALIGN", (0,0), (-1,-1), "LEFT"),
-        ("VALIGN", (0,0), (-1,-1), "TOP"),
-        ("LEFTPADDING", (0,0), (-1,-1), 8),
-        ("BOTTOMPADDING", (0,0), (-1,-1), 0),
-    ]))
-
-    header_row = PdfTable([[left_tbl, "", right_tbl]],
-                          colWidths=[W*0.40, TOP_GUTTER_PTS, W*0.60 - TOP_GUTTER_PTS])
-    story.append(header_row)
-    story.append(Spacer(1, 6))
+    ])
 
-    if pathlib.Path(LOGO_PATH).exists():
-        logo = fit_image(LOGO_PATH, max_w=W*LOGO_MAX_W_PCT, max_h=LOGO_MAX_H_PT)
-        story.append(PdfTable([[logo]], colWidths=[W],
-                              style=TableStyle([("ALIGN",(0,0),(-1,-1),"CENTER")])))
-        story.append(Spacer(1, LOGO_BOTTOM_SPACE))
-
-    story.append(Paragraph("Report Card", styles["rc_h1"]))
-    story.append(Paragraph(f"For School Year {year}", styles["rc_h2"]))
-    story.append(Spacer(1, 8))
+    COURSES_STYLE = TableStyle([
+        ("BACKGROUND", (0,0), (-1,0), ACCENT),
+        ("TEXTCOLOR", (0,0), (-1,0), colors.white),
+        ("FONTNAME", (0,0), (-1,0), "Helvetica-Bold"),
+        ("FONTSIZE", (0,0), (-1,0), 10.5),
+        ("FONTSIZE", (0,1), (-1,-1), 10),
+        ("ALIGN", (0,0), (-1,0), "CENTER"),
+        ("ALIGN", (3,1), (-1,-1), "CENTER"),  # center grade & credits
+        ("VALIGN", (0,0), (-1,-1), "MIDDLE"),
+        ("GRID", (0,0), (-1,-1), 0.6, BORDER_GRAY),
+        ("ROWBACKGROUNDS", (0,1), (-1,-1), [colors.white, ROW_ALT]),
+        ("LEFTPADDING", (0,0), (-1,-1), 6),
+        ("RIGHTPADDING", (0,0), (-1,-1), 6),
+        ("TOPPADDING", (0,0), (-1,-1), 6),
+        ("BOTTOMPADDING", (0,0), (-1,-1), 6),
+    ])
 
-    # Courses table
-    table_data = [["Course Name", "Course Number", "Teacher", "Grade (Letter)", "Grade %", "Transferred Credits"]]
-    expanded: List[List[str]] = []
-    for r in rows:
-        expanded.extend(build_course_rows(r.get("fields", {})))
+    HEADER_ROW_STYLE = TableStyle([
+        ("VALIGN", (2,0), (2,0), "TOP"),
+        ("LEFTPADDING", (2,0), (2,0), 8),
+        ("BOTTOMPADDING", (2,0), (2,0), 0),
+    ])
 
-    seen: Set[Tuple[str, str, str, str, str, str]] = set()
-    clean: List[List[str]] = []
-    for row in expanded:
-        t = tuple(row)
-        if t not in seen and any(x.strip() for x in row):
-            seen.add(t); clean.append(row)
-    clean.sort(key=lambda x: (x[0].lower(), x[1].lower()))
-    if not clean:
-        clean = [["(no courses found)", "", "", "", "", ""]]
-    table_data.extend(clean)
+    # The doc margins are fixed, so every column grid is precomputable; handing
+    # PdfTable literal widths skips its proportional layout solver per call.
+    DOC_W = page_w  # landscape(A4)[0] - 28 - 28
+    LEFT_COLS   = [DOC_W * 0.12, DOC_W * 0.28]
+    HEADER_COLS = [DOC_W * 0.40, TOP_GUTTER_PTS, DOC_W * 0.60 - TOP_GUTTER_PTS]
 
-    # ---- Column widths: accepts "a b c d e f" or "a,b,c,d,e,f"
-    def _parse_widths(s: str) -> Optional[List[float]]:
+    def _parse_widths(s):
         if not s:
             return None
         raw = s.replace(",", " ").split()
         try:
             vals = [float(x) for x in raw]
-            if len(vals) != 6:
-                return None
-            return vals
+            return vals if len(vals) == 6 else None
         except Exception:
             return None
 
     cfg_widths = _parse_widths(TABLE_COL_WIDTHS)
     if cfg_widths:
-        cw = [W * f for f in cfg_widths]
         print(f"[INFO] TABLE_COL_WIDTHS applied: {cfg_widths}")
     else:
         cfg_widths = [0.36, 0.19, 0.19, 0.09, 0.08, 0.09]
-        cw = [W * f for f in cfg_widths]
         print(f"[INFO] Using default column widths: {cfg_widths}")
+    COURSE_COLS = [DOC_W * f for f in cfg_widths]
+
+    _RL = SimpleNamespace(
+        A4=A4, landscape=landscape,
+        SimpleDocTemplate=SimpleDocTemplate, Paragraph=Paragraph, Spacer=Spacer,
+        PageBreak=PageBreak,
+        PdfTable=PdfTable, TableStyle=TableStyle, Image=Image,
+        SignatureBlock=SignatureBlock,
+        draw_page_border=draw_page_border, fit_image=fit_image,
+        LOGO_READER=LOGO_READER, SIG_READER=SIG_READER,
+        LOGO_SRC=LOGO_SRC, SIG_SRC=SIG_SRC,
+        STYLES=styles,
+        LEFT_TBL_STYLE=LEFT_TBL_STYLE, COURSES_STYLE=COURSES_STYLE,
+        HEADER_ROW_STYLE=HEADER_ROW_STYLE,
+        DOC_W=DOC_W, LEFT_COLS=LEFT_COLS, HEADER_COLS=HEADER_COLS, COURSE_COLS=COURSE_COLS,
+        STATIC_HEADER=None,
+    )
+    return _RL
+
+# The school card and logo are identical for every student; build them once and
+# reuse across build_pdf calls instead of re-laying them out per transcript.
+# (ReportLab named forms don't survive across documents, so flowable reuse is
+# the practical equivalent here.)
+def _static_header_parts(R, W: float) -> Tuple[Any, Any]:
+    if R.STATIC_HEADER is None:
+        styles = R.STYLES
+        # a plain list of flowables in the header cell; no nested sub-table
+        school_card = [
+            R.Paragraph(f"<b>{SCHOOL_NAME}</b>", styles["rc_body"]),
+            R.Paragraph(ADDR_LINE_1, styles["rc_small"]),
+            R.Paragraph(ADDR_LINE_2, styles["rc_small"]),
+            R.Paragraph(ADDR_LINE_3 or "", styles["rc_small"]),
+        ]
+        logo = None
+        if HAS_LOGO:
+            logo = R.fit_image(R.LOGO_SRC, max_w=W*LOGO_MAX_W_PCT, max_h=LOGO_MAX_H_PT)
+            logo.hAlign = "CENTER"
+        R.STATIC_HEADER = (school_card, logo)
+    return R.STATIC_HEADER
+
+def _inputs_hash(fields: Dict[str, Any], rows: List[Dict[str, Any]]) -> str:
+    """Deterministic digest of everything that shapes the rendered PDF:
+    the student fields, the course rows, asset mtimes, this file's mtime
+    (so code changes invalidate old outputs) and the render-affecting
+    config — header text, signature lines, column widths, image sizing."""
+    payload = (
+        fields,
+        [r.get("fields") for r in rows],
+        os.path.getmtime(LOGO_PATH) if HAS_LOGO else 0,
+        os.path.getmtime(SIGNATURE_PATH) if HAS_SIG else 0,
+        os.path.getmtime(__file__),
+        DATE_LINE,
+        PRINCIPAL_LINE,
+        (SCHOOL_NAME, ADDR_LINE_1, ADDR_LINE_2, ADDR_LINE_3),
+        TABLE_COL_WIDTHS,
+        (LOGO_MAX_W_PCT, LOGO_MAX_H_PT, LOGO_BOTTOM_SPACE,
+         SIG_IMG_SHIFT, SIG_IMG_MAX_W, SIG_IMG_MAX_H),
+    )
+    return hashlib.sha256(json.dumps(payload, sort_keys=True, default=str).encode()).hexdigest()
 
-    courses = PdfTable(table_data, colWidths=cw, repeatRows=1)
-    courses.setStyle(TableStyle([
-        ("BACKGROUND", (0,0), (-1,0), ACCENT),
-        ("TEXTCOLOR", (0,0), (-1,0), colors.white),
-        ("FONTNAME", (0,0), (-1,0), "Helvetica-Bold"),
-        ("FONTSIZE", (0,0), (-1,0), 10.5),
-        ("FONTSIZE", (0,1), (-1,-1), 10),
-        ("ALIGN", (0,0), (-1,0), "CENTER"),
-        ("ALIGN", (3,1), (-1,-1), "CENTER"),  # center grade & credits
-        ("VALIGN", (0,0), (-1,-1), "MIDDLE"),
-        ("GRID", (0,0), (-1,-1), 0.6, BORDER_GRAY),
-        ("ROWBACKGROUNDS", (0,1), (-1,-1), [colors.white, ROW_ALT]),
-        ("LEFTPADDING", (0,0), (-1,-1), 6),
-        ("RIGHTPADDING", (0,0), (-1,-1), 6),
-        ("TOPPADDING", (0,0), (-1,-1), 6),
-        ("BOTTOMPADDING", (0,0), (-1,-1), 6),
-    ]))
+def _student_story(R, W: float, student_fields: Dict[str, Any], rows: List[Dict[str, Any]],
+                   expanded: Optional[List[List[str]]] = None) -> List[Any]:
+    """Assemble the flowables for one student's transcript page(s)."""
+    student_name = sget(student_fields, F["student_name"]).strip()
+    student_id   = sget(student_fields, F["student_id"])
+    grade        = sget(student_fields, F["grade_select"])
+    year         = sget(student_fields, F["school_year"])
+
+    styles = R.STYLES
+
+    story: List[Any] = []
+
+    # Header strip. Values are bare strings: Table renders those directly,
+    # whereas Paragraph would run each through the XML parser (and choke on
+    # a literal '&' in a name). Only the bold title cell needs markup.
+    left_data = [
+        [R.Paragraph("<b>Student Info</b>", styles["rc_bold"]), ""],
+        ["Name", _pdf_safe(student_name)],
+        ["Current Grade Level", str(grade or "")],
+        ["Student ID", str(student_id or "")],
+    ]
+    left_tbl = R.PdfTable(left_data, colWidths=R.LEFT_COLS)
+    left_tbl.setStyle(R.LEFT_TBL_STYLE)
+
+    school_card, logo = _static_header_parts(R, W)
+
+    header_row = R.PdfTable([[left_tbl, "", school_card]],
+                            colWidths=R.HEADER_COLS,
+                            style=R.HEADER_ROW_STYLE)
+    story.append(header_row)
+    story.append(R.Spacer(1, 6))
+
+    if logo is not None:
+        story.append(logo)
+        story.append(R.Spacer(1, LOGO_BOTTOM_SPACE))
+
+    story.append(R.Paragraph("Report Card", styles["rc_h1"]))
+    story.append(R.Paragraph(f"For School Year {year}", styles["rc_h2"]))
+    story.append(R.Spacer(1, 8))
+
+    # Courses table
+    table_data = [["Course Name", "Course Number", "Teacher", "Grade (Letter)", "Grade %", "Transferred Credits"]]
+    if expanded is None:
+        expanded = _expand_rows(rows)
+
+    # one pass: dedup and compute the casefolded sort key per surviving row;
+    # fingerprint rows as a single joined string instead of interning a
+    # 6-tuple per membership check ("\x1f" can't occur in Airtable text)
+    seen: Set[str] = set()
+    keyed: List[Tuple[str, str, List[str]]] = []
+    for row in expanded:
+        fp = "\x1f".join(row)
+        if fp not in seen and any(x.strip() for x in row):
+            seen.add(fp)
+            keyed.append((row[0].casefold(), row[1].casefold(), [_pdf_safe(x) for x in row]))
+    keyed.sort(key=operator.itemgetter(0, 1))
+    clean: List[List[str]] = [k[2] for k in keyed]
+    if not clean:
+        clean = [["(no courses found)", "", "", "", "", ""]]
+    table_data.extend(clean)
+
+    courses = R.PdfTable(table_data, colWidths=R.COURSE_COLS, repeatRows=1)
+    courses.setStyle(R.COURSES_STYLE)
     story.append(courses)
-    story.append(Spacer(1, 10))
-
-    # Signature
-    sig_col_w = W * 0.38
-    if pathlib.Path(SIGNATURE_PATH).exists():
-        sig_img = ShiftedImage(SIGNATURE_PATH, max_w=SIG_IMG_MAX_W, max_h=SIG_IMG_MAX_H, dx=SIG_IMG_SHIFT)
-        img_tbl = PdfTable([[sig_img]], colWidths=[sig_col_w],
-                           style=TableStyle([("ALIGN",(0,0),(-1,-1),"CENTER")]))
-        img_row = [img_tbl]
-    else:
-        img_row = [Spacer(1, 0)]
-
-    line_tbl = PdfTable([[CenterLine(width=220, thickness=0.9)]], colWidths=[sig_col_w],
-                        style=TableStyle([("ALIGN",(0,0),(-1,-1),"CENTER")]))
-    principal_tbl = PdfTable([[Paragraph(f"Principal - {PRINCIPAL}", getSampleStyleSheet()["Normal"])]],
-                             colWidths=[sig_col_w],
-                             style=TableStyle([("ALIGN",(0,0),(-1,-1),"CENTER")]))
-    date_tbl = PdfTable([[Paragraph(f"Date: {datetime.today().strftime(SIGN_DATEFMT)}", getSampleStyleSheet()["Normal"])]],
-                        colWidths=[sig_col_w],
-                        style=TableStyle([("ALIGN",(0,0),(-1,-1),"CENTER")]))
-    sig_stack = [img_row, [Spacer(1, 3)], [line_tbl], [Spacer(1, 4)], [principal_tbl], [date_tbl]]
-    sig = PdfTable(sig_stack, colWidths=[sig_col_w])
-    sig_row = PdfTable([["", sig]], colWidths=[W*0.62, sig_col_w],
-                       style=TableStyle([("VALIGN",(0,0),(-1,-1),"BOTTOM")]))
-    story.append(sig_row)
-
-    doc.build(story, onFirstPage=draw_page_border, onLaterPages=draw_page_border)
+    story.append(R.Spacer(1, 10))
+
+    # Signature: a single flowable that draws image, rule and text straight
+    # on the canvas — nothing for Platypus to measure or paginate
+    story.append(R.SignatureBlock(W, W * 0.38))
+    return story
+
+def _write_pdf_atomic(pdf_path: pathlib.Path, data: bytes,
+                      hash_path: Optional[pathlib.Path] = None, digest: str = "") -> None:
+    """Write PDF bytes via a .tmp sibling + rename so consumers polling
+    output/ never see a half-written file; optionally record the inputs hash."""
+    tmp = pdf_path.with_suffix(".pdf.tmp")
+    tmp.write_bytes(data)
+    os.replace(tmp, pdf_path)
+    if hash_path is not None:
+        try:
+            hash_path.parent.mkdir(parents=True, exist_ok=True)
+            hash_path.write_text(digest)
+        except Exception as e:
+            print(f"[WARN] Could not record inputs hash: {e}")
+
+def build_pdf(student_fields: Dict[str, Any], rows: List[Dict[str, Any]],
+              expanded: Optional[List[List[str]]] = None):
+    student_name = sget(student_fields, F["student_name"]).strip()
+    student_id   = sget(student_fields, F["student_id"])
+    grade        = sget(student_fields, F["grade_select"])
+    year         = sget(student_fields, F["school_year"])
+
+    out = pathlib.Path("output"); out.mkdir(parents=True, exist_ok=True)
+    pdf_path = out / f"transcript_{safe_filename(student_name)}_{safe_filename(year)}.pdf"
+
+    # layout is the slowest step; skip it entirely when nothing that feeds the
+    # PDF has changed since the last run
+    digest = _inputs_hash(student_fields, rows)
+    hash_path = out / ".hash" / f"{pdf_path.stem}.sha"
+    try:
+        if pdf_path.is_file() and hash_path.is_file() and hash_path.read_text() == digest:
+            print(f"[OK] Unchanged inputs; reusing {pdf_path}")
+            return pdf_path
+    except Exception as e:
+        print(f"[DEBUG] Hash check failed ({e}); rebuilding.")
+
+    R = _rl()
+
+    # expand once here so the story below doesn't repeat the work
+    if expanded is None:
+        expanded = _expand_rows(rows)
+
+    buf = io.BytesIO()
+    doc = R.SimpleDocTemplate(
+        buf,
+        pagesize=R.landscape(R.A4),
+        leftMargin=28, rightMargin=28,
+        topMargin=24, bottomMargin=32,
+        pageCompression=1
+    )
+    story = _student_story(R, doc.width, student_fields, rows, expanded)
+
+    doc.build(story, onFirstPage=R.draw_page_border, onLaterPages=R.draw_page_border)
+    _write_pdf_atomic(pdf_path, buf.getvalue(), hash_path, digest)
     print(f"[OK] Generated landscape transcript → {pdf_path}")
     return pdf_path
 
+def build_pdf_combined(jobs: List[Tuple[str, Dict[str, Any], List[Dict[str, Any]], List[List[str]]]]) -> pathlib.Path:
+    """Render every student into one document with a single doc.build, page
+    breaks between students. One ReportLab layout pass for the whole batch."""
+    R = _rl()
+    out = pathlib.Path("output"); out.mkdir(parents=True, exist_ok=True)
+    pdf_path = out / "transcripts_combined.pdf"
+
+    buf = io.BytesIO()
+    doc = R.SimpleDocTemplate(
+        buf,
+        pagesize=R.landscape(R.A4),
+        leftMargin=28, rightMargin=28,
+        topMargin=24, bottomMargin=32,
+        pageCompression=1
+    )
+    story: List[Any] = []
+    for i, (_, header_fields, rows, expanded) in enumerate(jobs):
+        if i:
+            story.append(R.PageBreak())
+        story.extend(_student_story(R, doc.width, header_fields, rows, expanded))
+
+    doc.build(story, onFirstPage=R.draw_page_border, onLaterPages=R.draw_page_border)
+    _write_pdf_atomic(pdf_path, buf.getvalue())
+    print(f"[OK] Generated combined transcript ({len(jobs)} students) → {pdf_path}")
+    return pdf_path
+
+def _build_pdf_worker(job: Tuple[str, Dict[str, Any], List[Dict[str, Any]], List[List[str]]]) -> str:
+    _, header_fields, rows, expanded = job
+    return str(build_pdf(header_fields, rows, expanded))
+
 # ========= main =========
 def main():
     ids: List[str] = []
@@ -549,9 +1094,14 @@ def main():
     name_to_header: Dict[str, Dict[str, Any]] = {}
     name_to_rows: Dict[str, List[Dict[str, Any]]] = {}
 
+    resolved = bulk_resolve(ids)
+
     for rid in ids:
         try:
-            _, rec = get_rec_and_table(rid)
+            rec = resolved.get(rid)
+            if rec is None:
+                # stragglers (e.g. cache replay of old per-id runs) fall back to a GET
+                _, rec = get_rec_and_table(rid)
             fields = rec.get("fields", {})
             raw = fields.get(F["student_name"])
             name = raw[0] if isinstance(raw, list) and raw else str(raw or "")
@@ -562,12 +1112,7 @@ def main():
             if name not in name_to_header:
                 name_to_header[name] = fields
 
-            if INCLUDE_MATCH_BY_NAME:
-                rows = fetch_rows_for_name_across_all_tables(name)
-            else:
-                rows = [rec]
-
-            name_to_rows.setdefault(name, []).extend(rows)
+            name_to_rows.setdefault(name, []).append(rec)
 
         except SystemExit as e:
             print(str(e))
@@ -577,13 +1122,43 @@ def main():
     if not name_to_header:
         sys.exit("[ERROR] No usable records resolved from the provided IDs.")
 
+    if INCLUDE_MATCH_BY_NAME:
+        # one coalesced query for all names instead of one per record id
+        groups = fetch_rows_for_names_across_all_tables(list(name_to_header))
+        for name, extra in groups.items():
+            if extra:
+                name_to_rows[name] = extra
+
+    # expand each student's course rows exactly once; the PDF build and the
+    # log summary both consume the same list
+    jobs: List[Tuple[str, Dict[str, Any], List[Dict[str, Any]], List[List[str]]]] = []
     for student_name, header_fields in name_to_header.items():
         rows = name_to_rows.get(student_name, [])
         if not rows:
             print(f"[WARN] No rows for {student_name}; using header only.")
             rows = [{"fields": header_fields}]
-        pdf_file = build_pdf(header_fields, rows)
-        log_to_airtable(pdf_file, header_fields, rows)
+        jobs.append((student_name, header_fields, rows, _expand_rows(rows)))
+
+    # PDF layout is CPU-bound pure Python, so multi-student batches fan out
+    # across processes; Airtable logging stays on the main process afterwards.
+    workers = int(os.environ.get("PDF_WORKERS", "0")) or min(8, len(jobs), os.cpu_count() or 1)
+    if COMBINED_PDF and len(jobs) > 1:
+        combined = build_pdf_combined(jobs)
+        pdf_files = [str(combined)] * len(jobs)
+    elif len(jobs) > 1 and workers > 1:
+        from concurrent.futures import ProcessPoolExecutor
+        with ProcessPoolExecutor(max_workers=workers) as ex:
+            pdf_files = list(ex.map(_build_pdf_worker, jobs))
+    else:
+        pdf_files = [_build_pdf_worker(job) for job in jobs]
+
+    # batch-create the log rows (10 per request), then overlap the uploads
+    if len(jobs) > 1:
+        log_many([(pathlib.Path(pdf_file), header_fields, rows, expanded)
+                  for (_, header_fields, rows, expanded), pdf_file in zip(jobs, pdf_files)])
+    else:
+        for (student_name, header_fields, rows, expanded), pdf_file in zip(jobs, pdf_files):
+            log_to_airtable(pathlib.Path(pdf_file), header_fields, rows, expanded)
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,82 @@
+"""Mirror the transcript tables into a local SQLite database.
+
+Run out-of-band (cron or a scheduled workflow). main.py then serves the
+match-by-name lookups from an indexed B-tree scan of the mirror instead of a
+filterByFormula pass over the live tables — point MIRROR_DB at the file.
+"""
+import json, os, sqlite3, sys, time
+
+from pyairtable import Api
+
+AIRTABLE_API_KEY = os.environ["AIRTABLE_API_KEY"]
+AIRTABLE_BASE_ID = os.environ["AIRTABLE_BASE_ID"]
+
+TRANSCRIPT_TABLES_ENV     = os.environ.get("TRANSCRIPT_TABLES", "")
+TRANSCRIPT_TABLE_FALLBACK = os.environ.get("TRANSCRIPT_TABLE", "Students 1221")
+
+MIRROR_DB = os.environ.get("MIRROR_DB", "transcripts.sqlite")
+
+# keep in sync with the F projection in main.py
+FIELDS = [
+    "Student Name", "Student Canvas ID", "Grade Select", "School Year",
+    "Course Name", "Course Code", "Assigned Teachers", "Grade Letter",
+    "Current Score",
+    "Course Name Rollup (from Southlands Courses Enrollment 3)",
+    "Course Code Rollup (from Southlands Courses Enrollment 3)",
+]
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS records (
+    table_name   TEXT NOT NULL,
+    id           TEXT NOT NULL,
+    student_name TEXT NOT NULL,
+    fields_json  TEXT NOT NULL,
+    synced_at    REAL NOT NULL,
+    PRIMARY KEY (table_name, id)
+);
+CREATE INDEX IF NOT EXISTS idx_records_student_name ON records (student_name);
+"""
+
+def table_names():
+    if TRANSCRIPT_TABLES_ENV.strip():
+        return [t.strip() for t in TRANSCRIPT_TABLES_ENV.split(",") if t.strip()]
+    return [TRANSCRIPT_TABLE_FALLBACK]
+
+def main():
+    api = Api(AIRTABLE_API_KEY)
+    con = sqlite3.connect(MIRROR_DB)
+    con.executescript(SCHEMA)
+    now = time.time()
+
+    total = 0
+    for tname in table_names():
+        tbl = api.table(AIRTABLE_BASE_ID, tname)
+        con.execute("DELETE FROM records WHERE table_name = ?", (tname,))
+        n = 0
+        try:
+            for page in tbl.iterate(fields=FIELDS):
+                con.executemany(
+                    "INSERT OR REPLACE INTO records VALUES (?, ?, ?, ?, ?)",
+                    [(tname, r["id"], _name_of(r), json.dumps({"id": r["id"], "fields": r.get("fields", {})}), now)
+                     for r in page],
+                )
+                n += len(page)
+        except Exception as e:
+            print(f"[WARN] Could not mirror '{tname}': {e}")
+            con.rollback()
+            continue
+        con.commit()
+        total += n
+        print(f"[OK] {tname}: {n} records mirrored")
+
+    con.close()
+    if not total:
+        sys.exit("[ERROR] Nothing mirrored; leaving any previous snapshot in place.")
+    print(f"[OK] Mirror refreshed → {MIRROR_DB}")
+
+def _name_of(rec) -> str:
+    raw = rec.get("fields", {}).get("Student Name")
+    return raw[0] if isinstance(raw, list) and raw else str(raw or "")
+
+if __name__ == "__main__":
+    main()